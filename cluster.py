@@ -0,0 +1,175 @@
+import bisect
+import hashlib
+import threading
+import time
+import requests
+import config
+
+_lock = threading.Lock()
+_leaving = False
+
+def is_enabled():
+    """Check if cameras should be sharded across multiple GestureSensor instances"""
+    return config.config['cluster']['enabled']
+
+def instance_id():
+    """Get the identifier this instance announces itself with"""
+    return str(config.config['cluster']['instance_id'])
+
+def member_topic(member_id):
+    """Get the membership topic for an instance"""
+    return config.config['gesture']['topic'] + "/cluster/" + member_id
+
+def availability_topic():
+    """Get the shared availability topic"""
+    return config.config['gesture']['topic'] + "/" + 'availability'
+
+def _hash(key):
+    """Hash a key onto the ring"""
+    return int(hashlib.md5(key.encode('utf-8')).hexdigest()[:16], 16)
+
+def build_ring(members):
+    """Build a consistent hash ring with virtual nodes for each member"""
+    replicas = config.config['cluster']['replicas']
+    ring = []
+    for member in members:
+        for i in range(replicas):
+            ring.append((_hash(f"{member}#{i}"), member))
+    ring.sort()
+    return ring
+
+def owner_of(camera, ring):
+    """Get the member that owns a camera on the ring"""
+    if not ring:
+        return None
+    index = bisect.bisect(ring, (_hash(camera), ""))
+    if index == len(ring):
+        index = 0
+    return ring[index][1]
+
+def setup(client):
+    """Register the last will so peers fail over when this instance disappears"""
+    if not is_enabled():
+        return
+    client.will_set(member_topic(instance_id()), "offline", retain=True)
+    print(f"Cluster mode enabled as instance: {instance_id()}")
+
+def keepalive():
+    """Get the MQTT keepalive, kept short in cluster mode so the last will fires within seconds"""
+    if not is_enabled():
+        return 60
+    return config.config['cluster']['keepalive']
+
+def announce(client):
+    """Join the cluster and start listening for other instances"""
+    # Retained peer states arrive before the live echo of this announcement,
+    # so the ring is complete by the time we add ourselves and rebalance
+    with _lock:
+        config.cluster_members = set()
+    client.subscribe(member_topic("+"))
+    client.publish(member_topic(instance_id()), "online", retain=True)
+    print(f"Announced cluster membership on {member_topic(instance_id())}")
+
+def leave(client):
+    """Leave the cluster, only marking the sensor offline if no other instance remains"""
+    global _leaving
+    _leaving = True
+    client.publish(member_topic(instance_id()), "offline", retain=True)
+    with _lock:
+        config.cluster_members.discard(instance_id())
+        others = len(config.cluster_members)
+    if others == 0:
+        client.publish(availability_topic(), "offline", retain=True)
+
+def on_member_message(client, msg):
+    """Track instances joining or leaving and rebalance cameras"""
+    member = msg.topic.split("/")[-1]
+    status = msg.payload.decode('utf-8', errors='replace')
+    if member == instance_id() and msg.retain:
+        # Our retained state is left over from an earlier session and may arrive
+        # before some peers, so only the live echo of announce() counts
+        return
+    if member == instance_id() and status != "online":
+        if not _leaving:
+            # The broker published the last will of our previous session after we announced
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S')} - Received offline for this instance, announcing again")
+            client.publish(member_topic(instance_id()), "online", retain=True)
+        return
+    with _lock:
+        before = set(config.cluster_members)
+        if status == "online":
+            config.cluster_members.add(member)
+        else:
+            config.cluster_members.discard(member)
+        changed = before != config.cluster_members
+        members = sorted(config.cluster_members)
+    if not changed:
+        return
+    print(f"{time.strftime('%Y-%m-%d %H:%M:%S')} - Cluster members: {', '.join(members)}")
+    if instance_id() not in members:
+        # Wait for our own announcement before taking any cameras
+        return
+    if status != "online":
+        # The departed instance may have published offline for everyone
+        client.publish(availability_topic(), "online", retain=True)
+    rebalance(client)
+
+def update_person_count(camera, num_persons):
+    """Store a person count received over MQTT"""
+    with _lock:
+        config.numpersons[camera] = num_persons
+        config.countupdated[camera] = True
+
+def _seed_person_count(camera):
+    """Seed the person count of an adopted camera from Frigate's in-progress events"""
+    # Frigate does not retain the person count, so a camera taken over while
+    # someone is in view would otherwise wait for the next count change
+    try:
+        frigate_url = f"http://{config.config['frigate']['host']}:{config.config['frigate']['port']}/api/events"
+        params = {'camera': camera, 'label': 'person', 'in_progress': 1}
+        response = requests.get(frigate_url, params=params, timeout=10)
+        if response.status_code == 200:
+            num_persons = len(response.json())
+            with _lock:
+                # A count received over MQTT while we were waiting is more recent
+                seeded = camera in config.assigned_cameras and not config.countupdated.get(camera, False)
+                if seeded:
+                    config.numpersons[camera] = num_persons
+            if seeded:
+                print(f"Seeded {camera} with {num_persons} person(s) from Frigate")
+        else:
+            print(f"Failed to retrieve person count for {camera} from Frigate API: {response.status_code}")
+    except Exception as e:
+        print(f"Error retrieving person count for {camera} from Frigate API: {str(e)}")
+
+def rebalance(client):
+    """Subscribe to cameras assigned to this instance and release the rest"""
+    with _lock:
+        cameras = config.config['frigate']['cameras']
+        if is_enabled():
+            ring = build_ring(config.cluster_members)
+            assigned = {camera for camera in cameras if owner_of(camera, ring) == instance_id()}
+        else:
+            assigned = set(cameras)
+        adopted = assigned - config.assigned_cameras
+        released = config.assigned_cameras - assigned
+        config.assigned_cameras = assigned
+
+    for camera in sorted(released):
+        topic = f"frigate/{camera}/person"
+        client.unsubscribe(topic)
+        config.numpersons[camera] = 0
+        config.sentpayload[camera] = ""
+        print(f"Released {camera}, unsubscribed from {topic}")
+
+    for camera in sorted(adopted):
+        topic = f"frigate/{camera}/person"
+        # Force the first result to overwrite the retained state left by the previous owner
+        config.sentpayload[camera] = ""
+        with _lock:
+            config.countupdated[camera] = False
+        client.subscribe(topic)
+        print(f"Subscribed to {topic}")
+        if is_enabled():
+            # Query Frigate off the MQTT thread so the keepalive is not delayed
+            threading.Thread(target=_seed_person_count, args=(camera,), daemon=True).start()
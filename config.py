@@ -1,11 +1,15 @@
 import yaml
 import paho.mqtt.client as mqtt
 import os
+import socket
 import time
 
 config = ""
 numpersons = {}
 sentpayload = {}
+countupdated = {}
+assigned_cameras = set()
+cluster_members = set()
 client = mqtt.Client()
 
 def init():
@@ -67,10 +71,39 @@ def _apply_defaults():
         if key not in config['storage']:
             config['storage'][key] = value
     
+    # Ensure cluster config exists with defaults
+    if 'cluster' not in config:
+        config['cluster'] = {}
+    
+    cluster_defaults = {
+        'enabled': False,
+        'instance_id': socket.gethostname(),
+        'keepalive': 5,
+        'replicas': 100
+    }
+    
+    for key, value in cluster_defaults.items():
+        if key not in config['cluster']:
+            config['cluster'][key] = value
+    
+    _validate_cluster()
+    
     # Ensure double-take config exists and move detect_all_results to double-take
     if 'double-take' in config and 'detect_all_results' not in config['double-take']:
         config['double-take']['detect_all_results'] = False
 
+def _validate_cluster():
+    """Reject cluster settings that would break membership topics or the hash ring"""
+    instance_id = str(config['cluster']['instance_id'])
+    if not instance_id or any(char in instance_id for char in '/+#'):
+        raise ValueError(f"cluster.instance_id must be non-empty and must not contain '/', '+' or '#': {instance_id!r}")
+    config['cluster']['instance_id'] = instance_id
+    
+    for key in ('keepalive', 'replicas'):
+        value = config['cluster'][key]
+        if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+            raise ValueError(f"cluster.{key} must be a positive integer: {value!r}")
+
 def _init_camera_states():
     """Initialize the state for each camera"""
     import requests
@@ -92,6 +125,7 @@ def _init_camera_states():
     for camera in config['frigate']['cameras']:
         numpersons[camera] = 0
         sentpayload[camera] = ""
+        countupdated[camera] = False
 
 def should_use_double_take(camera_name):
     """Check if a camera should use Double-Take for face recognition"""
@@ -11,6 +11,7 @@ import contextlib
 import os
 import copy
 import uuid
+import cluster
 
 def pubinitial(cameraname):
     """Publish an initial state for a camera with empty person and gesture"""
@@ -34,6 +35,10 @@ def pubinitial(cameraname):
 
 def pubresults(cameraname, name, gesture, process_duration=0, dt_results=None, hand_rect=None, process_id=None):
     """Publish detection results for a camera with enhanced data"""
+    # The camera may have been handed to another instance while it was being processed
+    if cameraname not in config.assigned_cameras:
+        return
+    
     topic = config.config['gesture']['topic'] + "/" + cameraname
     
     # Generate unique ID if not provided
@@ -168,11 +173,17 @@ def lookforhands():
     payload = "online"
     config.client.publish(topic, payload, retain=True)
     
-    for camera in config.config['frigate']['cameras']:
-        pubinitial(camera)
+    # In cluster mode, cameras are assigned later and rebalance() resets
+    # sentpayload, so the first state is published by the loop below
+    if not cluster.is_enabled():
+        for camera in config.config['frigate']['cameras']:
+            pubinitial(camera)
     
     while True:
-        for cameraname in config.numpersons:
+        for cameraname in list(config.numpersons):
+            # Skip cameras handled by another instance
+            if cameraname not in config.assigned_cameras:
+                continue
             numcamerapeople = config.numpersons[cameraname]
             if numcamerapeople > 0:
                 process_start_time = time.time()
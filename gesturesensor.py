@@ -1,6 +1,7 @@
 import threading
 import mqtthandlers
 import config
+import cluster
 import gesturedetection
 import time
 import sys
@@ -24,10 +25,13 @@ def main():
     # Set up MQTT authentication if configured
     mqtthandlers.setup_mqtt_auth(config.client)
     
+    # Set up cluster membership if configured
+    cluster.setup(config.client)
+    
     # Connect to MQTT broker
     try:
         print(f"Connecting to MQTT broker at {config.config['mqtt']['host']}:{config.config['mqtt']['port']}...")
-        config.client.connect(config.config['mqtt']['host'], config.config['mqtt']['port'], 60)
+        config.client.connect(config.config['mqtt']['host'], config.config['mqtt']['port'], cluster.keepalive())
         print("Connected to MQTT broker")
     except Exception as e:
         print(f"Error connecting to MQTT broker: {str(e)}")
@@ -45,6 +49,8 @@ def main():
     print(f"MQTT Broker: {config.config['mqtt']['host']}:{config.config['mqtt']['port']}")
     print(f"Frigate Server: {config.config['frigate']['host']}:{config.config['frigate']['port']}")
     print(f"Monitoring cameras: {', '.join(config.config['frigate']['cameras'])}")
+    if cluster.is_enabled():
+        print(f"Cluster instance: {cluster.instance_id()} (cameras are shared with other instances)")
     if 'double-take' in config.config:
         print(f"Double-Take Server: {config.config['double-take']['host']}:{config.config['double-take']['port']}")
         if 'cameras' in config.config['double-take']:
@@ -71,8 +77,11 @@ def main():
     except KeyboardInterrupt:
         print("\nShutting down GestureSensor...")
         # Publish offline status before exiting
-        topic = config.config['gesture']['topic'] + "/" + 'availability'
-        config.client.publish(topic, "offline", retain=True)
+        if cluster.is_enabled():
+            cluster.leave(config.client)
+        else:
+            topic = config.config['gesture']['topic'] + "/" + 'availability'
+            config.client.publish(topic, "offline", retain=True)
         time.sleep(1)  # Give time for the message to be sent
         sys.exit(0)
 
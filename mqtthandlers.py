@@ -1,4 +1,5 @@
 import config
+import cluster
 
 def on_publish(client, userdata, result):
     """Callback when a message is published"""
@@ -7,6 +8,10 @@ def on_publish(client, userdata, result):
 def on_message(client, userdata, msg):
     """Callback when a message is received"""
     try:
+        if cluster.is_enabled() and msg.topic.startswith(cluster.member_topic("")):
+            cluster.on_member_message(client, msg)
+            return
+        
         # Extract camera name from topic
         topic_parts = msg.topic.split("/")
         if len(topic_parts) >= 2:
@@ -15,9 +20,9 @@ def on_message(client, userdata, msg):
             # Update number of persons for this camera
             try:
                 num_persons = int(msg.payload)
-                config.numpersons[camera_name] = num_persons
+                cluster.update_person_count(camera_name, num_persons)
             except (ValueError, TypeError):
-                config.numpersons[camera_name] = 0
+                cluster.update_person_count(camera_name, 0)
                 print(f"Invalid payload for {msg.topic}: {msg.payload}")
         else:
             print(f"Unexpected topic format: {msg.topic}")
@@ -28,11 +33,15 @@ def on_connect(client, userdata, flags, rc):
     """Callback when connection to MQTT broker is established"""
     print(f"Connected to MQTT broker with result code {rc}")
     
+    # Subscriptions do not survive a reconnect, so assign cameras from scratch
+    config.assigned_cameras = set()
+    if cluster.is_enabled():
+        # Cameras are assigned once our own announcement comes back
+        cluster.announce(client)
+        return
+    
     # Subscribe to person detection topics for all configured cameras
-    for camera in config.config['frigate']['cameras']:
-        topic = f"frigate/{camera}/person"
-        client.subscribe(topic)
-        print(f"Subscribed to {topic}")
+    cluster.rebalance(client)
 
 def setup_mqtt_auth(client):
     """Set up MQTT authentication if configured"""